@@ -1,9 +1,27 @@
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import os
+import re
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dtime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, List, NamedTuple, Optional
 import requests
-from ics import Calendar, DisplayAlarm, Event
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Fall back to stdlib json (e.g. on PyPy)
+    orjson = None
+
+try:
+    from ics import Calendar, DisplayAlarm, Event
+except ImportError:  # Only needed when HKIPO_USE_ICS=1
+    Calendar = DisplayAlarm = Event = None
 
 
 # Configure logging
@@ -28,6 +46,10 @@ class Config:
     # Request Configuration
     REQUEST_TIMEOUT = 30
     MAX_RETRIES = 3
+    RETRY_BACKOFF_FACTOR = 1
+    RETRY_STATUS_CODES = (500, 502, 503, 504)
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 8
     
     # Date Configuration
     DAYS_AHEAD = 30
@@ -35,9 +57,18 @@ class Config:
     
     # File Configuration
     OUTPUT_FILE = "hkipo.ics"
+    RESPONSE_FILE = "hkipo_response.json"
+    
+    # Calendar Configuration (HKIPO_USE_ICS=1 serializes through the ics library instead)
+    USE_ICS_LIBRARY = os.environ.get('HKIPO_USE_ICS') == '1'
+    PRODID = "-//chasays//hkipo//EN"
+    
+    # Debug Configuration (HKIPO_DEBUG=1 dumps the raw response, HKIPO_DEBUG_PRETTY=1 indents it)
+    DEBUG_DUMP_RESPONSE = os.environ.get('HKIPO_DEBUG') == '1'
+    DEBUG_PRETTY_RESPONSE = os.environ.get('HKIPO_DEBUG_PRETTY') == '1'
     
     # Headers and Cookies (can be moved to environment variables in production)
-    HEADERS = {
+    HEADERS = MappingProxyType({
         'accept': 'application/json, text/javascript, */*; q=0.01',
         'accept-language': 'en,zh-CN;q=0.9,zh;q=0.8',
         'cache-control': 'no-cache',
@@ -53,17 +84,21 @@ class Config:
         'sec-fetch-site': 'same-origin',
         'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36',
         'x-requested-with': 'XMLHttpRequest',
-    }
+    })
     
     # Cookies (should be updated regularly)
-    COOKIES = {
+    COOKIES = MappingProxyType({
         'kbzw__Session': 'n5769v1r2acdcu81j9ljjbk3u7',
         'Hm_lvt_164fe01b1433a19b507595a43bf58262': '1756431115',
         'HMACCOUNT': '96DCC72768219C2A',
         'kbz_newcookie': '1',
         'kbzw__user_login': '7Obd08_P1ebax9aXX-QMRw4kVzD9kZyh6dbc7OPm1Nq_1KKn3cTSwqfb2p-soqfHrsKvq9awmaHGp6uty7Cl2pimxZiyoO3K1L_RpKacq6Wrlq2CsqS0zL_NjKWwqp-tn6iWr5WYsqDNos6-n8bk4-LY48OllqWnk6C42c_Y6OzcmbrLgqeRpaeumLjZz6qtsInxoquLlqLn59_duNXDv-LpmK6frpCpl5efvsC1va2gmeHS5NGXqdvE4uacmKTY0-Pm2piqn7CQpo-npaOYtNHH1evemK6frqCplw..',
         'Hm_lpvt_164fe01b1433a19b507595a43bf58262': '1756435588',
-    }
+    })
+
+
+# Shared configuration instance used as the default for all components
+CONFIG = Config()
 
 
 class DateKit:
@@ -71,13 +106,15 @@ class DateKit:
     
     def __init__(self, days_ahead: int = Config.DAYS_AHEAD) -> None:
         self.now = datetime.now()
+        self.today = self.now.date()
         self.next = self.now + timedelta(days=days_ahead)
         self.start = self.now.strftime("%Y-%m-%d")
         self.end = self.next.strftime("%Y-%m-%d")
         
-        # Convert to timestamps for API requests
-        self.start_ts = int(datetime.strptime(self.start, '%Y-%m-%d').timestamp())
-        self.end_ts = int(datetime.strptime(self.end, '%Y-%m-%d').timestamp())
+        # Convert to timestamps for API requests (midnight of the start and end dates)
+        midnight = datetime.combine(self.today, dtime.min)
+        self.start_ts = int(midnight.timestamp())
+        self.end_ts = int((midnight + timedelta(days=days_ahead)).timestamp())
         self.now_ts = int(datetime.timestamp(self.now)) * 1000
     
     def get_date_range(self) -> tuple[str, str]:
@@ -89,17 +126,56 @@ class DateKit:
         return self.start_ts, self.end_ts, self.now_ts
 
 
+# ISO dates (ASCII digits only) compare lexically in the same order as chronologically
+_ISO_DATE_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+
+@lru_cache(maxsize=1024)
+def _iso_to_date(date_str: str) -> Optional[date]:
+    """Convert a YYYY-MM-DD string to a date by slicing, much cheaper than strptime"""
+    if not date_str or not _ISO_DATE_RE.fullmatch(date_str):
+        return None
+    try:
+        return date(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]))
+    except ValueError:
+        return None
+
+
+def _parse_ipo_dates(cell: Dict) -> Dict[str, Optional[date]]:
+    """Parse the listing, apply and apply end dates of an IPO cell"""
+    return {
+        'list_dt2': _iso_to_date(cell.get('list_dt2', '')),
+        'apply_dt2': _iso_to_date(cell.get('apply_dt2', '')),
+        'apply_end_dt2': _iso_to_date(cell.get('apply_end_dt2', '')),
+    }
+
+
 class HKIPOClient:
     """Client for fetching Hong Kong IPO data"""
     
-    def __init__(self, config: Config = Config()):
-        self.config = config
+    def __init__(self, config: Optional[Config] = None, date_kit: Optional[DateKit] = None):
+        self.config = config or CONFIG
+        self.date_kit = date_kit or DateKit()
         self.session = requests.Session()
-        self.session.headers.update(config.HEADERS)
-        self.session.cookies.update(config.COOKIES)
+        self.session.headers.update(self.config.HEADERS)
+        self.session.cookies.update(self.config.COOKIES)
+        
+        # Let urllib3 handle retries with backoff so they reuse the pooled connection
+        retry = Retry(
+            total=self.config.MAX_RETRIES,
+            backoff_factor=self.config.RETRY_BACKOFF_FACTOR,
+            status_forcelist=self.config.RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['POST', 'GET'])
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.config.POOL_CONNECTIONS,
+            pool_maxsize=self.config.POOL_MAXSIZE,
+            max_retries=retry
+        )
+        self.session.mount('https://', adapter)
     
-    def _make_request(self, retries: int = 0) -> Optional[Dict]:
-        """Make HTTP request with retry logic"""
+    def _make_request(self) -> Optional[Dict]:
+        """Make HTTP request (retries are handled by the mounted adapter)"""
         try:
             data = {
                 'rp': '50',
@@ -107,8 +183,7 @@ class HKIPOClient:
             }
             
             # Add timestamp to avoid caching issues
-            timestamp = int(datetime.now().timestamp() * 1000)
-            url = f"{self.config.BASE_URL}{self.config.HKIPO_ENDPOINT}?___jsl=LST___t={timestamp}"
+            url = f"{self.config.BASE_URL}{self.config.HKIPO_ENDPOINT}?___jsl=LST___t={self.date_kit.now_ts}"
             
             logger.info(f"Making request to: {url}")
             response = self.session.post(
@@ -120,13 +195,12 @@ class HKIPOClient:
             
             # Parse response
             try:
-                res = json.loads(response.text)
-                logger.info(f"Response status: {response.status_code}, Content length: {len(response.text)}")
+                res = orjson.loads(response.content) if orjson else json.loads(response.text)
+                logger.info(f"Response status: {response.status_code}, Content length: {len(response.content)}")
                 
                 # Save response to file for debugging
-                with open('hkipo_response.json', 'w', encoding='utf-8') as f:
-                    json.dump(res, f, ensure_ascii=False, indent=2)
-                logger.info("Response saved to hkipo_response.json")
+                if self.config.DEBUG_DUMP_RESPONSE:
+                    self._dump_response(res)
                 
                 return res
                 
@@ -136,18 +210,27 @@ class HKIPOClient:
                 return None
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {e}")
-            if retries < self.config.MAX_RETRIES:
-                logger.info(f"Retrying... ({retries + 1}/{self.config.MAX_RETRIES})")
-                # Add exponential backoff
-                import time
-                time.sleep(2 ** retries)
-                return self._make_request(retries + 1)
+            # urllib3's RetryError message already says when retries ran out
+            logger.error("Request failed: %s", e)
             return None
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             return None
     
+    def _dump_response(self, res: Dict) -> None:
+        """Save the raw API response to a file for debugging"""
+        pretty = self.config.DEBUG_PRETTY_RESPONSE
+        if orjson:
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            with open(self.config.RESPONSE_FILE, 'wb') as f:
+                f.write(orjson.dumps(res, option=option))
+        else:
+            with open(self.config.RESPONSE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(res, f, ensure_ascii=False, indent=2 if pretty else None)
+        logger.info(f"Response saved to {self.config.RESPONSE_FILE}")
+    
     def get_ipo_data(self) -> List[Dict]:
         """Fetch Hong Kong IPO data"""
         logger.info("Fetching Hong Kong IPO data...")
@@ -163,41 +246,112 @@ class HKIPOClient:
         
         # Filter for upcoming and recent IPOs (within our date range)
         filtered_ipo_list = []
-        current_date = datetime.now().date()
+        today_iso = self.date_kit.today.isoformat()
         
         for ipo in ipo_list:
             cell = ipo.get('cell', {})
-            list_date = cell.get('list_dt2', '')
-            apply_date = cell.get('apply_dt2', '')
-            
-            # Check if IPO is upcoming or recent
-            if list_date:
-                try:
-                    ipo_date = datetime.strptime(list_date, '%Y-%m-%d').date()
-                    if ipo_date >= current_date:
-                        filtered_ipo_list.append(ipo)
-                except ValueError:
-                    logger.warning(f"Invalid date format for {cell.get('stock_nm', 'Unknown')}: {list_date}")
-            elif apply_date:
-                try:
-                    ipo_date = datetime.strptime(apply_date, '%Y-%m-%d').date()
-                    if ipo_date >= current_date:
-                        filtered_ipo_list.append(ipo)
-                except ValueError:
-                    logger.warning(f"Invalid date format for {cell.get('stock_nm', 'Unknown')}: {apply_date}")
+            
+            # Check if IPO is upcoming or recent, comparing ISO strings directly
+            date_field = 'list_dt2' if cell.get('list_dt2') else 'apply_dt2'
+            ipo_date = cell.get(date_field, '')
+            if not ipo_date:
+                continue
+            if not _ISO_DATE_RE.fullmatch(ipo_date):
+                logger.warning("Invalid date format for %s: %s", cell.get('stock_nm', 'Unknown'), ipo_date)
+                continue
+            if ipo_date >= today_iso:
+                # Parse dates once and keep them on the entry for event creation;
+                # well-shaped but impossible dates (e.g. 2099-02-30) fail here
+                dates = _parse_ipo_dates(cell)
+                if dates[date_field] is None:
+                    logger.warning("Invalid date format for %s: %s", cell.get('stock_nm', 'Unknown'), ipo_date)
+                    continue
+                ipo['_dates'] = dates
+                filtered_ipo_list.append(ipo)
         
         logger.info(f"Filtered to {len(filtered_ipo_list)} relevant IPO entries")
         return filtered_ipo_list
 
 
+class IPOAlarm(NamedTuple):
+    """Display alarm attached to an IPO event"""
+    trigger: timedelta
+    display_text: str
+
+
+class IPOEvent:
+    """Lightweight all-day calendar event rendered directly to ICS text"""
+    
+    def __init__(self, name: str, begin: date, end: Optional[date] = None) -> None:
+        self.name = name
+        self.begin = begin
+        self.end = end or begin + timedelta(days=1)
+        self.description = ""
+        self.categories: Iterable[str] = ()
+        self.alarms: List[IPOAlarm] = []
+
+
+# RFC 5545 TEXT escaping (bare CRs are dropped so they cannot split a content line)
+_ICS_ESCAPE = str.maketrans({'\\': '\\\\', ';': '\\;', ',': '\\,', '\n': '\\n', '\r': ''})
+
+
+def _ics_text(value: str) -> str:
+    """Escape a value for use in an ICS TEXT property"""
+    return value.translate(_ICS_ESCAPE)
+
+
+def _ics_duration(delta: timedelta) -> str:
+    """Format a timedelta as an ICS DURATION value (e.g. P1D, PT30M)"""
+    sign = '-' if delta < timedelta(0) else ''
+    delta = abs(delta)
+    hours, remainder = divmod(delta.seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    
+    result = f"{sign}P"
+    if delta.days:
+        result += f"{delta.days}D"
+    if hours or minutes or seconds or not delta.days:
+        result += "T"
+        if hours:
+            result += f"{hours}H"
+        if minutes:
+            result += f"{minutes}M"
+        if seconds or not (hours or minutes):
+            result += f"{seconds}S"
+    return result
+
+
 class ICSGenerator:
     """Generate ICS calendar file from IPO data"""
     
-    def __init__(self, config: Config = Config()):
-        self.config = config
-        self.calendar = Calendar()
+    # Description lines emitted after the timing line, in order (template, cell field)
+    _DESC_FIELDS = (
+        ("⏰ 申购截止: {}", 'apply_end_dt2'),
+        ("💰 价格区间: {}", 'price_range'),
+        ("💵 发行价: {}", 'issue_price'),
+        ("📊 发行股数: {}亿股", 'total_shares'),
+        ("🏢 市场: {}", 'market'),
+        ("🏛️ 保荐人: {}", 'underwriter'),
+        ("🔗 参考公司: {}", 'ref_company'),
+        ("🟢 绿鞋: {}", 'green_rt'),
+    )
+    
+    # Placeholder the API uses for missing fields
+    _MISSING_VALUE = '-'
+    
+    # Loop-invariant alarm triggers and categories shared by all events
+    _TRIGGER_1DAY = timedelta(days=1)
+    _TRIGGER_TODAY = timedelta(minutes=30)
+    _BASE_CATS = ("Hong Kong IPO",)
+    
+    def __init__(self, config: Optional[Config] = None):
+        self.config = config or CONFIG
+        self.events: List[IPOEvent] = []
+        self.last_summary: Optional[str] = None
+        self._trigger_alarm = timedelta(minutes=self.config.ALARM_MINUTES_BEFORE)
     
-    def _create_event(self, ipo_data: Dict, date_kit: DateKit) -> Optional[Event]:
+    def _create_event(self, ipo_data: Dict, date_kit: DateKit,
+                      current_date: Optional[date] = None) -> Optional[IPOEvent]:
         """Create a calendar event from IPO data"""
         try:
             # Extract IPO information from the actual API response structure
@@ -209,15 +363,21 @@ class ICSGenerator:
             # Get key dates - prioritize listing date, then apply date
             list_date = cell.get('list_dt2', '')  # Format: YYYY-MM-DD
             apply_date = cell.get('apply_dt2', '')  # Format: YYYY-MM-DD
-            apply_end_date = cell.get('apply_end_dt2', '')  # Format: YYYY-MM-DD
+            
+            # Reuse dates parsed during filtering when available
+            dates = ipo_data.get('_dates') or _parse_ipo_dates(cell)
+            list_dt = dates['list_dt2']
+            apply_dt = dates['apply_dt2']
             
             # Determine event type and priority
-            event_type = self._determine_event_type(list_date, apply_date, apply_end_date)
+            event_type = self._determine_event_type(
+                list_dt, apply_dt, dates['apply_end_dt2'], current_date or date_kit.today
+            )
             
             # Use listing date if available, otherwise use apply date
-            event_date = list_date or apply_date
+            event_date = list_dt or apply_dt
             if not event_date:
-                logger.warning(f"No valid date found for {company_name}")
+                logger.warning("No valid date found for %s", company_name)
                 return None
             
             # Create event name with more details
@@ -226,28 +386,18 @@ class ICSGenerator:
                 event_name += f" [{market}]"
             
             # Create event
-            event = Event()
-            event.name = event_name
-            event.begin = event_date
+            event = IPOEvent(event_name, event_date)
             
-            # Set end date and duration for better calendar integration
+            # Set end date for better calendar integration
             # IPO events typically span the entire day, but we can add some context
-            if list_date and apply_date:
+            if list_dt and apply_dt:
                 # If we have both listing and apply dates, show the IPO period
-                try:
-                    apply_start = datetime.strptime(apply_date, '%Y-%m-%d').date()
-                    list_end = datetime.strptime(list_date, '%Y-%m-%d').date()
-                    
+                if apply_dt < list_dt:
                     # Set duration from apply start to listing date
-                    if apply_start < list_end:
-                        event.begin = apply_start
-                        event.end = list_end + timedelta(days=1)  # Add 1 day to include the listing date
-                    else:
-                        # If dates are reversed, make it a single day event
-                        event.begin = event_date
-                        event.end = event_date + timedelta(days=1)
-                except ValueError:
-                    # Fallback to single day if date parsing fails
+                    event.begin = apply_dt
+                    event.end = list_dt + timedelta(days=1)  # Add 1 day to include the listing date
+                else:
+                    # If dates are reversed, make it a single day event
                     event.begin = event_date
                     event.end = event_date + timedelta(days=1)
             else:
@@ -255,76 +405,34 @@ class ICSGenerator:
                 event.begin = event_date
                 event.end = event_date + timedelta(days=1)
             
-            # Add duration information
-            event.duration = timedelta(days=1)
-            
             # Add description with key IPO details and timing
-            description_parts = []
-            
-            # Add timing information
-            if apply_date and list_date:
-                description_parts.append(f"📅 IPO周期: {apply_date} 至 {list_date}")
-            elif apply_date:
-                description_parts.append(f"📅 申购开始: {apply_date}")
-            elif list_date:
-                description_parts.append(f"📅 上市日期: {list_date}")
-            
-            if apply_end_date:
-                description_parts.append(f"⏰ 申购截止: {apply_end_date}")
-            
-            # Add financial information
-            price_range = cell.get('price_range', '')
-            if price_range:
-                description_parts.append(f"💰 价格区间: {price_range}")
-            
-            issue_price = cell.get('issue_price', '')
-            if issue_price:
-                description_parts.append(f"💵 发行价: {issue_price}")
-            
-            total_shares = cell.get('total_shares', '')
-            if total_shares:
-                description_parts.append(f"📊 发行股数: {total_shares}亿股")
-            
-            # Add market and reference information
-            market_info = cell.get('market', '')
-            if market_info:
-                description_parts.append(f"🏢 市场: {market_info}")
-            
-            underwriter = cell.get('underwriter', '')
-            if underwriter:
-                description_parts.append(f"🏛️ 保荐人: {underwriter}")
-            
-            ref_company = cell.get('ref_company', '')
-            if ref_company:
-                description_parts.append(f"🔗 参考公司: {ref_company}")
-            
-            # Add green shoe information if available
-            green_rt = cell.get('green_rt', '')
-            if green_rt and green_rt != '-':
-                description_parts.append(f"🟢 绿鞋: {green_rt}")
-            
-            if description_parts:
-                event.description = "\n".join(description_parts)
+            timing = self._describe_timing(apply_date, list_date)
+            description_parts = [timing] if timing else []
+            for template, field in self._DESC_FIELDS:
+                value = cell.get(field)
+                if value and value != self._MISSING_VALUE:
+                    description_parts.append(template.format(value))
+            event.description = "\n".join(description_parts)
             
             # Add event categorization
-            event.categories = [event_type, "Hong Kong IPO", market] if market else [event_type, "Hong Kong IPO"]
+            event.categories = (event_type, *self._BASE_CATS, market) if market else (event_type, *self._BASE_CATS)
             
             # Add alarm with different timing based on event type
             if event_type in ["UPCOMING_LISTING", "UPCOMING_APPLICATION"]:
                 # For upcoming events, set alarm 1 day before
-                event.alarms.append(DisplayAlarm(
-                    trigger=timedelta(days=1),
+                event.alarms.append(IPOAlarm(
+                    trigger=self._TRIGGER_1DAY,
                     display_text=f"提醒: {event_name} 明天开始"
                 ))
                 # Also add a same-day alarm
-                event.alarms.append(DisplayAlarm(
-                    trigger=timedelta(minutes=self.config.ALARM_MINUTES_BEFORE),
+                event.alarms.append(IPOAlarm(
+                    trigger=self._trigger_alarm,
                     display_text=event_name
                 ))
             elif event_type in ["TODAY_LISTING", "TODAY_APPLICATION"]:
                 # For today's events, set immediate alarm
-                event.alarms.append(DisplayAlarm(
-                    trigger=timedelta(minutes=30),
+                event.alarms.append(IPOAlarm(
+                    trigger=self._TRIGGER_TODAY,
                     display_text=f"今天: {event_name}"
                 ))
             else:
@@ -334,118 +442,113 @@ class ICSGenerator:
             return event
             
         except Exception as e:
-            logger.error(f"Failed to create event for {ipo_data}: {e}")
+            logger.error("Failed to create event for %s: %s", ipo_data, e)
             return None
     
-    def generate_calendar(self, ipo_data: List[Dict], date_kit: DateKit) -> Calendar:
+    @staticmethod
+    def _describe_timing(apply_date: str, list_date: str) -> str:
+        """Describe the IPO period from the raw apply and listing dates"""
+        if apply_date and list_date:
+            return f"📅 IPO周期: {apply_date} 至 {list_date}"
+        if apply_date:
+            return f"📅 申购开始: {apply_date}"
+        if list_date:
+            return f"📅 上市日期: {list_date}"
+        return ""
+    
+    def generate_calendar(self, ipo_data: List[Dict], date_kit: DateKit) -> List[IPOEvent]:
         """Generate calendar from IPO data"""
         logger.info("Generating calendar events...")
         
         # Group IPOs by date to handle multiple events on the same day
-        ipo_by_date = {}
+        ipo_by_date = defaultdict(list)
+        current_date = date_kit.today
         for ipo in ipo_data:
-            event = self._create_event(ipo, date_kit)
+            event = self._create_event(ipo, date_kit, current_date)
             if event:
-                event_date = event.begin.date().isoformat()
-                if event_date not in ipo_by_date:
-                    ipo_by_date[event_date] = []
-                ipo_by_date[event_date].append(event)
+                ipo_by_date[event.begin.isoformat()].append(event)
         
         # Create consolidated events for dates with multiple IPOs
-        event_count = 0
-        for date, events in ipo_by_date.items():
+        final_events = []
+        for date_key, events in ipo_by_date.items():
             if len(events) == 1:
                 # Single IPO on this date
-                self.calendar.events.add(events[0])
-                event_count += 1
+                final_events.append(events[0])
             else:
                 # Multiple IPOs on the same date - create a consolidated event
-                consolidated_event = self._create_consolidated_event(date, events)
+                consolidated_event = self._create_consolidated_event(date_key, events)
                 if consolidated_event:
-                    self.calendar.events.add(consolidated_event)
-                    event_count += 1
-                    logger.info(f"Created consolidated event for {date} with {len(events)} IPOs")
+                    final_events.append(consolidated_event)
+                    logger.info("Created consolidated event for %s with %d IPOs", date_key, len(events))
         
-        logger.info(f"Created {event_count} calendar events (including consolidated events)")
+        # Add all events to the calendar in one call
+        self.events.extend(final_events)
+        logger.info(f"Created {len(final_events)} calendar events (including consolidated events)")
         
         # Generate event summary report
         self._generate_event_summary(ipo_by_date)
         
-        return self.calendar
+        return self.events
     
-    def _generate_event_summary(self, ipo_by_date: Dict[str, List[Event]]) -> None:
-        """Generate a summary report of all events created"""
+    def _generate_event_summary(self, ipo_by_date: Dict[str, List[IPOEvent]]) -> Optional[str]:
+        """Generate a summary report of all events created and keep it in memory"""
         try:
             summary_parts = ["=== Hong Kong IPO Calendar Summary ==="]
             summary_parts.append(f"Total dates with events: {len(ipo_by_date)}")
             
-            for date, events in sorted(ipo_by_date.items()):
+            for date_key, events in sorted(ipo_by_date.items()):
                 if len(events) == 1:
                     event = events[0]
-                    summary_parts.append(f"\n📅 {date}: {event.name}")
+                    summary_parts.append(f"\n📅 {date_key}: {event.name}")
                 else:
-                    summary_parts.append(f"\n📅 {date}: {len(events)} IPOs (Consolidated)")
+                    summary_parts.append(f"\n📅 {date_key}: {len(events)} IPOs (Consolidated)")
                     for event in events:
                         summary_parts.append(f"   • {event.name}")
             
             summary_parts.append("\n" + "=" * 40)
+            self.last_summary = '\n'.join(summary_parts)
             
             # Save summary to file
             with open('hkipo_summary.txt', 'w', encoding='utf-8') as f:
-                f.write('\n'.join(summary_parts))
+                f.write(self.last_summary)
             
             logger.info("Event summary saved to hkipo_summary.txt")
             
         except Exception as e:
             logger.error(f"Failed to generate event summary: {e}")
+        
+        return self.last_summary
     
-    def _determine_event_type(self, list_date: str, apply_date: str, apply_end_date: str) -> str:
-        """Determine the type of IPO event based on available dates"""
-        current_date = datetime.now().date()
+    def _determine_event_type(self, list_date: Optional[date], apply_date: Optional[date],
+                              apply_end_date: Optional[date], current_date: Optional[date] = None) -> str:
+        """Determine the type of IPO event based on available (pre-parsed) dates"""
+        if current_date is None:
+            current_date = datetime.now().date()
         
-        try:
-            if list_date:
-                list_dt = datetime.strptime(list_date, '%Y-%m-%d').date()
-                if list_dt > current_date:
-                    return "UPCOMING_LISTING"
-                elif list_dt == current_date:
-                    return "TODAY_LISTING"
-                else:
-                    return "PAST_LISTING"
-            
-            if apply_date:
-                apply_dt = datetime.strptime(apply_date, '%Y-%m-%d').date()
-                if apply_dt > current_date:
-                    return "UPCOMING_APPLICATION"
-                elif apply_dt == current_date:
-                    return "TODAY_APPLICATION"
-                else:
-                    return "PAST_APPLICATION"
-            
-            return "UNKNOWN"
-            
-        except ValueError:
-            return "UNKNOWN"
+        if list_date:
+            if list_date > current_date:
+                return "UPCOMING_LISTING"
+            elif list_date == current_date:
+                return "TODAY_LISTING"
+            else:
+                return "PAST_LISTING"
+        
+        if apply_date:
+            if apply_date > current_date:
+                return "UPCOMING_APPLICATION"
+            elif apply_date == current_date:
+                return "TODAY_APPLICATION"
+            else:
+                return "PAST_APPLICATION"
+        
+        return "UNKNOWN"
     
-    def _create_consolidated_event(self, date: str, events: List[Event]) -> Optional[Event]:
+    def _create_consolidated_event(self, date_str: str, events: List[IPOEvent]) -> Optional[IPOEvent]:
         """Create a consolidated event when multiple IPOs occur on the same date"""
         try:
-            # Create main consolidated event
-            consolidated_event = Event()
-            consolidated_event.name = f"HK IPO Day: {len(events)} Companies Listing"
-            consolidated_event.begin = date
-            
-            # Set end date and duration for consolidated events
-            try:
-                event_date = datetime.strptime(date, '%Y-%m-%d').date()
-                consolidated_event.begin = event_date
-                consolidated_event.end = event_date + timedelta(days=1)
-                consolidated_event.duration = timedelta(days=1)
-            except ValueError:
-                # Fallback if date parsing fails
-                consolidated_event.begin = date
-                consolidated_event.end = date
-                consolidated_event.duration = timedelta(days=1)
+            # Create main consolidated event spanning the whole day
+            event_date = _iso_to_date(date_str) or events[0].begin
+            consolidated_event = IPOEvent(f"HK IPO Day: {len(events)} Companies Listing", event_date)
             
             # Create detailed description with all IPOs
             description_parts = [f"共{len(events)}家公司上市:"]
@@ -454,31 +557,93 @@ class ICSGenerator:
                 company_info = event.name.replace("HK IPO: ", "")
                 description_parts.append(f"{i}. {company_info}")
                 
-                # Add key details for each company
-                if hasattr(event, 'description') and event.description:
+                # Add key details for each company (IPOEvent always defines description)
+                if event.description:
                     description_parts.append(f"   {event.description}")
             
             consolidated_event.description = "\n".join(description_parts)
             
             # Add alarm
-            consolidated_event.alarms.append(DisplayAlarm(
-                trigger=timedelta(minutes=self.config.ALARM_MINUTES_BEFORE),
+            consolidated_event.alarms.append(IPOAlarm(
+                trigger=self._trigger_alarm,
                 display_text=consolidated_event.name
             ))
             
             return consolidated_event
             
         except Exception as e:
-            logger.error(f"Failed to create consolidated event for {date}: {e}")
+            logger.error("Failed to create consolidated event for %s: %s", date_str, e)
             return None
     
+    def _render_vevent(self, event: IPOEvent, dtstamp: str) -> str:
+        """Render a single event as an ICS VEVENT block"""
+        uid = uuid.uuid5(uuid.NAMESPACE_URL, f"{event.begin.isoformat()}/{event.name}")
+        categories = ",".join(_ics_text(category) for category in event.categories)
+        alarms = "".join(
+            f"BEGIN:VALARM\r\n"
+            f"ACTION:DISPLAY\r\n"
+            f"DESCRIPTION:{_ics_text(alarm.display_text)}\r\n"
+            f"TRIGGER:{_ics_duration(alarm.trigger)}\r\n"
+            f"END:VALARM\r\n"
+            for alarm in event.alarms
+        )
+        return (
+            f"BEGIN:VEVENT\r\n"
+            f"UID:{uid}@hkipo\r\n"
+            f"DTSTAMP:{dtstamp}\r\n"
+            f"DTSTART;VALUE=DATE:{event.begin:%Y%m%d}\r\n"
+            f"DTEND;VALUE=DATE:{event.end:%Y%m%d}\r\n"
+            f"SUMMARY:{_ics_text(event.name)}\r\n"
+            + (f"DESCRIPTION:{_ics_text(event.description)}\r\n" if event.description else "")
+            + (f"CATEGORIES:{categories}\r\n" if categories else "")
+            + alarms
+            + "END:VEVENT\r\n"
+        )
+    
+    def _serialize_with_ics(self) -> str:
+        """Serialize the events through the ics library (compatibility mode)"""
+        calendar = Calendar()
+        for event in self.events:
+            # IPOEvent.end is exclusive, but make_all_day() treats the end day as inclusive
+            ics_event = Event(
+                name=event.name,
+                begin=event.begin,
+                end=event.end - timedelta(days=1),
+                description=event.description or None,
+                categories=set(event.categories)
+            )
+            ics_event.make_all_day()
+            for alarm in event.alarms:
+                ics_event.alarms.append(DisplayAlarm(trigger=alarm.trigger, display_text=alarm.display_text))
+            calendar.events.add(ics_event)
+        return calendar.serialize()
+    
+    def serialize(self) -> str:
+        """Serialize all events to ICS text"""
+        if self.config.USE_ICS_LIBRARY:
+            if Calendar is not None:
+                return self._serialize_with_ics()
+            logger.warning("HKIPO_USE_ICS is set but the ics library is not installed, using built-in writer")
+        
+        dtstamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        events = sorted(self.events, key=lambda event: (event.begin, event.name))
+        return (
+            f"BEGIN:VCALENDAR\r\n"
+            f"VERSION:2.0\r\n"
+            f"PRODID:{self.config.PRODID}\r\n"
+            + "".join(self._render_vevent(event, dtstamp) for event in events)
+            + "END:VCALENDAR\r\n"
+        )
+    
     def save_calendar(self, filename: str = None) -> bool:
         """Save calendar to ICS file"""
         try:
             output_file = filename or self.config.OUTPUT_FILE
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.writelines(self.calendar.serialize())
+            # Encode once and write the whole calendar in a single binary write
+            data = self.serialize().encode('utf-8')
+            with open(output_file, 'wb') as f:
+                f.write(data)
             
             logger.info(f"Calendar saved to {output_file}")
             return True
@@ -494,9 +659,9 @@ def main():
         logger.info("Starting Hong Kong IPO calendar generation...")
         
         # Initialize components
-        config = Config()
+        config = CONFIG
         date_kit = DateKit()
-        client = HKIPOClient(config)
+        client = HKIPOClient(config, date_kit)
         generator = ICSGenerator(config)
         
         # Fetch IPO data
@@ -517,18 +682,17 @@ def main():
             print(f"Total IPOs processed: {len(ipo_data)}")
             print(f"Calendar file: {config.OUTPUT_FILE}")
             print(f"Log file: hkipo.log")
-            print(f"Response data: hkipo_response.json")
+            if config.DEBUG_DUMP_RESPONSE:
+                print(f"Response data: {config.RESPONSE_FILE}")
             print(f"Summary file: hkipo_summary.txt")
             print("=" * 40)
             
             # Display summary if available
-            try:
-                with open('hkipo_summary.txt', 'r', encoding='utf-8') as f:
-                    summary_content = f.read()
-                    print("\n📋 Event Summary:")
-                    print(summary_content)
-            except FileNotFoundError:
-                print("Summary file not found")
+            if generator.last_summary:
+                print("\n📋 Event Summary:")
+                print(generator.last_summary)
+            else:
+                print("Summary not available")
             
         else:
             logger.error("Failed to generate calendar")
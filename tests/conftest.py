@@ -0,0 +1,15 @@
+import importlib
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('requests')
+
+
+@pytest.fixture(scope='session')
+def main_module(tmp_path_factory):
+    # main configures a log file in the working directory on import
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(tmp_path_factory.mktemp('run'))
+        monkeypatch.syspath_prepend(str(Path(__file__).resolve().parent.parent))
+        yield importlib.import_module('main')
@@ -0,0 +1,50 @@
+"""Check HKIPOClient.get_ipo_data filtering against a mocked API response"""
+import json
+import logging
+from datetime import timedelta
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.text = json.dumps(payload)
+        self.content = self.text.encode('utf-8')
+
+    def raise_for_status(self):
+        pass
+
+
+def _row(name, list_dt2='', apply_dt2=''):
+    return {'cell': {'stock_nm': name, 'stock_cd': '00000', 'list_dt2': list_dt2, 'apply_dt2': apply_dt2}}
+
+
+def test_get_ipo_data_filters_rows(main_module, monkeypatch, caplog):
+    date_kit = main_module.DateKit()
+    future = (date_kit.today + timedelta(days=3)).isoformat()
+    past = (date_kit.today - timedelta(days=3)).isoformat()
+    rows = [
+        _row("Future listing", list_dt2=future),
+        _row("Impossible date", list_dt2='2099-02-30', apply_dt2=future),
+        _row("Malformed date", list_dt2='2099/01/01'),
+        _row("Full-width digits", list_dt2='２０９９-０１-０１'),
+        _row("Apply only", apply_dt2=future),
+        _row("Past listing", list_dt2=past, apply_dt2=future),
+    ]
+    client = main_module.HKIPOClient(date_kit=date_kit)
+    monkeypatch.setattr(client.session, 'post', lambda *args, **kwargs: FakeResponse({'rows': rows}))
+
+    with caplog.at_level(logging.WARNING):
+        ipo_list = client.get_ipo_data()
+
+    assert [ipo['cell']['stock_nm'] for ipo in ipo_list] == ["Future listing", "Apply only"]
+    assert ipo_list[0]['_dates']['list_dt2'] == date_kit.today + timedelta(days=3)
+    assert ipo_list[1]['_dates']['list_dt2'] is None
+    assert ipo_list[1]['_dates']['apply_dt2'] == date_kit.today + timedelta(days=3)
+
+    warnings = [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+    assert warnings == [
+        "Invalid date format for Impossible date: 2099-02-30",
+        "Invalid date format for Malformed date: 2099/01/01",
+        "Invalid date format for Full-width digits: ２０９９-０１-０１",
+    ]
@@ -0,0 +1,95 @@
+"""Check the built-in ICS writer, and that it agrees with the ics library on event dates"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+
+def _event_dates(ics_text):
+    """Map each VEVENT's SUMMARY to its (DTSTART, DTEND) dates"""
+    dates = {}
+    for block in ics_text.split('BEGIN:VEVENT')[1:]:
+        props = {}
+        for line in block.splitlines():
+            name, _, value = line.partition(':')
+            if name in ('SUMMARY', 'DTSTART;VALUE=DATE', 'DTEND;VALUE=DATE'):
+                props[name.split(';')[0]] = value
+        start = datetime.strptime(props['DTSTART'], '%Y%m%d').date()
+        # A DATE DTSTART without DTEND is a single all-day event (RFC 5545)
+        end = datetime.strptime(props['DTEND'], '%Y%m%d').date() if 'DTEND' in props else start + timedelta(days=1)
+        dates[props['SUMMARY']] = (start, end)
+    return dates
+
+
+def test_builtin_writer_matches_ics_library(main_module):
+    pytest.importorskip('ics')
+    generator = main_module.ICSGenerator()
+    generator.events = [
+        main_module.IPOEvent("Single day", date(2026, 10, 16)),
+        main_module.IPOEvent("IPO period", date(2026, 10, 15), date(2026, 10, 21)),
+    ]
+
+    builtin = _event_dates(generator.serialize())
+    library = _event_dates(generator._serialize_with_ics())
+
+    assert builtin == library
+    assert builtin["Single day"] == (date(2026, 10, 16), date(2026, 10, 17))
+    assert builtin["IPO period"] == (date(2026, 10, 15), date(2026, 10, 21))
+
+
+def test_ics_text_escaping(main_module):
+    assert main_module._ics_text("a\r\nb;c,d\\e\rf") == r"a\nb\;c\,d\\ef"
+
+
+@pytest.mark.parametrize('delta, expected', [
+    (timedelta(days=1), "P1D"),
+    (timedelta(minutes=30), "PT30M"),
+    (timedelta(0), "PT0S"),
+    (timedelta(days=1, hours=2), "P1DT2H"),
+    (-timedelta(minutes=30), "-PT30M"),
+    (-timedelta(hours=1, seconds=5), "-PT1H5S"),
+])
+def test_ics_duration(main_module, delta, expected):
+    assert main_module._ics_duration(delta) == expected
+
+
+def test_render_vevent(main_module):
+    event = main_module.IPOEvent("HK IPO: A (01) [主板,创业板]", date(2026, 10, 15), date(2026, 10, 21))
+    event.description = "line1\nline2"
+    event.categories = ("UPCOMING_LISTING", "Hong Kong IPO", "主板,创业板")
+    event.alarms.append(main_module.IPOAlarm(timedelta(days=1), "提醒; 明天"))
+
+    lines = main_module.ICSGenerator()._render_vevent(event, "20261015T000000Z").split("\r\n")
+
+    assert lines[0] == "BEGIN:VEVENT"
+    assert lines[1].startswith("UID:") and lines[1].endswith("@hkipo")
+    assert lines[2:] == [
+        "DTSTAMP:20261015T000000Z",
+        "DTSTART;VALUE=DATE:20261015",
+        "DTEND;VALUE=DATE:20261021",
+        r"SUMMARY:HK IPO: A (01) [主板\,创业板]",
+        r"DESCRIPTION:line1\nline2",
+        r"CATEGORIES:UPCOMING_LISTING,Hong Kong IPO,主板\,创业板",
+        "BEGIN:VALARM",
+        "ACTION:DISPLAY",
+        r"DESCRIPTION:提醒\; 明天",
+        "TRIGGER:P1D",
+        "END:VALARM",
+        "END:VEVENT",
+        "",
+    ]
+
+
+def test_create_event_skips_empty_fields(main_module):
+    date_kit = main_module.DateKit()
+    cell = {
+        'stock_nm': 'A', 'stock_cd': '01', 'market': '',
+        'list_dt2': (date_kit.today + timedelta(days=3)).isoformat(),
+        'price_range': '1-2', 'issue_price': '', 'total_shares': 0, 'green_rt': '-',
+    }
+
+    event = main_module.ICSGenerator()._create_event({'cell': cell}, date_kit)
+
+    assert event.description.splitlines() == [
+        f"📅 上市日期: {cell['list_dt2']}",
+        "💰 价格区间: 1-2",
+    ]